@@ -1,45 +1,92 @@
-import json
+import io
+import os
+import ijson
+import orjson
+import zstandard as zstd
 from pathlib import Path
 
 # Directory with extracted files
 extracted_dir = Path("c:\\Users\\asus\\Desktop\\FlightCrashes\\NTSB_scraping\\ntsb_data\\extracted")
+output_file = extracted_dir / "merged_all_cases.json"
+
+# Get all JSON case files, plain or zstd-compressed (not readme.txt, and not a
+# previous merge output); scandir's DirEntry caches the file type, so there's no extra stat per file
+case_files = {}
+with os.scandir(extracted_dir) as entries:
+    for e in entries:
+        if not (e.is_file() and e.name.endswith((".json", ".json.zst")) and "cases" in e.name
+                and e.name != output_file.name):
+            continue
+        # Re-extracting next to the shipped plain files leaves both X.json and X.json.zst;
+        # merge each month once, preferring the compressed copy
+        base_name = e.name[:-len(".zst")] if e.name.endswith(".zst") else e.name
+        if base_name not in case_files or e.name.endswith(".zst"):
+            case_files[base_name] = e.path
 
-# Get all JSON case files (not readme.txt)
-json_files = sorted([f for f in extracted_dir.glob("*.json") if "cases" in f.name])
+json_files = [case_files[base_name] for base_name in sorted(case_files)]
 
 print(f"Found {len(json_files)} JSON files to merge")
 
-all_cases = []
+
+def open_case_file(path):
+    """Open a case file for binary reading, decompressing .zst files as they stream"""
+    f = open(path, 'rb')
+    if path.endswith('.zst'):
+        return zstd.ZstdDecompressor().stream_reader(f)
+    return f
+
+
+def iter_cases(path):
+    """Yield the case records of a case file one at a time"""
+    # Decompressed streams can't seek back, so each pass reopens the file
+    with open_case_file(path) as f:
+        _, first_event, _ = next(ijson.parse(f))
+
+    # Handle if the JSON is a list or a dict
+    if first_event == 'start_array':
+        with open_case_file(path) as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    elif first_event == 'start_map':
+        # Check common keys for case data
+        found = False
+        with open_case_file(path) as f:
+            for case in ijson.items(f, 'cases.item', use_float=True):
+                found = True
+                yield case
+        if not found:
+            with open_case_file(path) as f:
+                data = orjson.loads(f.read())
+            if 'cases' not in data:
+                yield data
+    else:
+        raise ValueError(f"expected a JSON array or object, got {first_event}")
+
+
 total_records = 0
 
-for json_file in json_files:
-    print(f"Processing {json_file.name}...", end=" ")
-    try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-            # Handle if the JSON is a list or a dict
-            if isinstance(data, list):
-                all_cases.extend(data)
-                total_records += len(data)
-            elif isinstance(data, dict):
-                # Check common keys for case data
-                if 'cases' in data:
-                    all_cases.extend(data['cases'])
-                    total_records += len(data['cases'])
-                else:
-                    all_cases.append(data)
-                    total_records += 1
-        
-        print(f"✓ ({len(data) if isinstance(data, list) else 1} records)")
-    except Exception as e:
-        print(f"✗ Error: {e}")
-
-# Save merged data
-output_file = extracted_dir / "merged_all_cases.json"
+# Stream the merged array to disk so only one file's cases are held in memory at a time
+with open(output_file, 'wb') as out:
+    out.write(b'[')
+
+    for json_file in json_files:
+        print(f"Processing {os.path.basename(json_file)}...", end=" ")
+        file_records = 0
+        # Buffer the file's cases so one that fails partway adds nothing to the output
+        file_buf = io.BytesIO()
+        try:
+            for case in iter_cases(json_file):
+                file_buf.write(b',\n' if total_records + file_records else b'\n')
+                file_buf.write(orjson.dumps(case))
+                file_records += 1
+        except Exception as e:
+            print(f"✗ Error after {file_records} records: {e}")
+            continue
+
+        out.write(file_buf.getbuffer())
+        total_records += file_records
+        print(f"✓ ({file_records} records)")
 
-with open(output_file, 'w', encoding='utf-8') as f:
-    json.dump(all_cases, f, indent=2, ensure_ascii=False)
+    out.write(b'\n]\n')
 
 print(f"\n✓ Merged {total_records} total records")
 print(f"Saved to: {output_file}")
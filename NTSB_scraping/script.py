@@ -1,29 +1,75 @@
-import requests
+import httpx
 import json
+import orjson
 import os
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
 class NTSBScraper:
-    def __init__(self, output_dir="ntsb_data"):
+    # Static query-builder option blocks, shared by every month's payload
+    _EVENT_DATE_OPT = {
+        "FieldName": "EventDate",
+        "DisplayText": "Event date",
+        "Columns": ["Event.EventDate"],
+        "Selectable": True,
+        "InputType": "Date",
+        "RuleType": 0,
+        "Options": None,
+        "TargetCollection": "cases",
+        "UnderDevelopment": True
+    }
+    _MODE_OPT = {
+        "FieldName": "Mode",
+        "DisplayText": "Investigation mode",
+        "Columns": ["Event.Mode"],
+        "Selectable": True,
+        "InputType": "Dropdown",
+        "RuleType": 0,
+        "Options": None,
+        "TargetCollection": "cases",
+        "UnderDevelopment": True
+    }
+    # CAROL query session sent with every export request
+    SESSION_ID = 227230
+    
+    def __init__(self, output_dir="ntsb_data", max_workers=6, session_id=SESSION_ID):
         self.base_url = "https://data.ntsb.gov/carol-main-public/api/Query/FileExport"
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.max_workers = max_workers
+        self.session_id = session_id
         
+        # Host and Connection are left to httpx; HTTP/2 forbids connection-specific headers
         self.headers = {
             'Accept': '*/*',
             'Accept-Encoding': 'gzip, deflate, br, zstd',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
             'Content-Type': 'application/json',
-            'Host': 'data.ntsb.gov',
             'Origin': 'https://data.ntsb.gov',
             'Sec-Fetch-Dest': 'empty',
             'Sec-Fetch-Mode': 'cors',
             'Sec-Fetch-Site': 'same-origin',
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:145.0) Gecko/20100101 Firefox/145.0'
         }
+        
+        # Payload serialized once; each month only swaps in its dates
+        self._payload_template = orjson.dumps(self._build_payload("{{FIRST}}", "{{LAST}}", self.session_id))
+        
+        # One pooled HTTP/2 client shared by all worker threads
+        self.session = httpx.Client(http2=True, headers=self.headers, timeout=60)
+    
+    def close(self):
+        """Close the underlying HTTP client"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
     
     def get_month_date_range(self, year, month):
         """Get the first and last day of a given month"""
@@ -37,11 +83,9 @@ class NTSBScraper:
         
         return first_day.strftime("%Y-%m-%d"), last_day.strftime("%Y-%m-%d")
     
-    def create_payload(self, year, month, session_id=227230):
-        """Create the POST request payload for a specific month"""
-        first_day, last_day = self.get_month_date_range(year, month)
-        
-        payload = {
+    def _build_payload(self, first_day, last_day, session_id):
+        """Assemble the query payload around the shared option blocks"""
+        return {
             "QueryGroups": [{
                 "QueryRules": [
                     {
@@ -50,34 +94,14 @@ class NTSBScraper:
                         "Columns": ["Event.EventDate"],
                         "Operator": "is on or after",
                         "overrideColumn": "",
-                        "selectedOption": {
-                            "FieldName": "EventDate",
-                            "DisplayText": "Event date",
-                            "Columns": ["Event.EventDate"],
-                            "Selectable": True,
-                            "InputType": "Date",
-                            "RuleType": 0,
-                            "Options": None,
-                            "TargetCollection": "cases",
-                            "UnderDevelopment": True
-                        }
+                        "selectedOption": self._EVENT_DATE_OPT
                     },
                     {
                         "RuleType": "Simple",
                         "Values": [last_day],
                         "Columns": ["Event.EventDate"],
                         "Operator": "is on or before",
-                        "selectedOption": {
-                            "FieldName": "EventDate",
-                            "DisplayText": "Event date",
-                            "Columns": ["Event.EventDate"],
-                            "Selectable": True,
-                            "InputType": "Date",
-                            "RuleType": 0,
-                            "Options": None,
-                            "TargetCollection": "cases",
-                            "UnderDevelopment": True
-                        },
+                        "selectedOption": self._EVENT_DATE_OPT,
                         "overrideColumn": ""
                     },
                     {
@@ -85,17 +109,7 @@ class NTSBScraper:
                         "Values": ["Aviation"],
                         "Columns": ["Event.Mode"],
                         "Operator": "is",
-                        "selectedOption": {
-                            "FieldName": "Mode",
-                            "DisplayText": "Investigation mode",
-                            "Columns": ["Event.Mode"],
-                            "Selectable": True,
-                            "InputType": "Dropdown",
-                            "RuleType": 0,
-                            "Options": None,
-                            "TargetCollection": "cases",
-                            "UnderDevelopment": True
-                        },
+                        "selectedOption": self._MODE_OPT,
                         "overrideColumn": ""
                     }
                 ],
@@ -110,10 +124,15 @@ class NTSBScraper:
             "ResultSetSize": 500,
             "SortDescending": True
         }
-        
-        return payload
     
-    def download_month(self, year, month, delay=2):
+    def encode_payload(self, year, month):
+        """Get the JSON-encoded payload for a month by filling in the pre-serialized template"""
+        first_day, last_day = self.get_month_date_range(year, month)
+        return (self._payload_template
+                .replace(b"{{FIRST}}", first_day.encode())
+                .replace(b"{{LAST}}", last_day.encode()))
+    
+    def download_month(self, year, month, delay=0.5):
         """Download data for a specific month"""
         filename = f"ntsb_{year}_{month:02d}.zip"
         filepath = self.output_dir / filename
@@ -125,49 +144,46 @@ class NTSBScraper:
         
         # Update referer header for this specific request
         referer = f"https://data.ntsb.gov/carol-main-public/query-builder?month={month}&year={year}"
-        headers = self.headers.copy()
-        headers['Referer'] = referer
         
         # Create payload
-        payload = self.create_payload(year, month)
+        payload = self.encode_payload(year, month)
+        
+        # Stream into a temp file so a partial download never looks complete
+        tmp_path = filepath.with_suffix('.zip.tmp')
         
         try:
-            print(f"Downloading: {filename}... ", end="", flush=True)
-            
-            response = requests.post(
+            with self.session.stream(
+                "POST",
                 self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-            
-            response.raise_for_status()
+                headers={'Referer': referer},
+                content=payload
+            ) as response:
+                response.raise_for_status()
+                
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_bytes(chunk_size=64 * 1024):
+                        f.write(chunk)
             
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+            os.replace(tmp_path, filepath)
             
-            file_size = len(response.content) / 1024  # kb
-            print(f"✓ Success ({file_size:.2f} KB)")
+            file_size = os.path.getsize(filepath) / 1024  # kb
+            print(f"✓ Downloaded: {filename} ({file_size:.2f} KB)")
             
-            time.sleep(delay)
+            # Jittered pause so the workers don't hit the server in lockstep
+            time.sleep(random.uniform(0, delay))
             return True
             
-        except requests.exceptions.RequestException as e:
-            print(f"✗ Failed: {str(e)}")
+        except httpx.HTTPError as e:
+            print(f"✗ Failed: {filename}: {str(e)}")
+            if tmp_path.exists():
+                tmp_path.unlink()
             return False
     
-    def download_all(self, start_year=2010, end_year=2025, delay=2):
-        total = 0
-        successful = 0
-        failed = 0
-        
+    def download_all(self, start_year=2010, end_year=2025, delay=0.5):
         current_date = datetime.now()
         
+        jobs = []
         for year in range(start_year, end_year + 1):
-            print(f"\n{'='*50}")
-            print(f"Year: {year}")
-            print(f"{'='*50}")
-            
             # Determine last month to download for this year
             if year == current_date.year:
                 last_month = current_date.month
@@ -175,11 +191,16 @@ class NTSBScraper:
                 last_month = 12
             
             for month in range(1, last_month + 1):
-                total += 1
-                if self.download_month(year, month, delay):
-                    successful += 1
-                else:
-                    failed += 1
+                jobs.append((year, month))
+        
+        print(f"Downloading {len(jobs)} months with {self.max_workers} workers")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(lambda ym: self.download_month(*ym, delay=delay), jobs))
+        
+        total = len(results)
+        successful = sum(results)
+        failed = total - successful
         
         # Summary
         print(f"\n{'='*50}")
@@ -191,7 +212,5 @@ class NTSBScraper:
         print(f"Files saved to: {self.output_dir.absolute()}")
 
 if __name__ == "__main__":
-    scraper = NTSBScraper(output_dir="ntsb_data")
-    
-
-    scraper.download_all(start_year=2010, end_year=2025, delay=2)
\ No newline at end of file
+    with NTSBScraper(output_dir="ntsb_data") as scraper:
+        scraper.download_all(start_year=2010, end_year=2025, delay=0.5)
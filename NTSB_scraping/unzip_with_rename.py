@@ -1,52 +1,70 @@
 import zipfile
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
+import zstandard as zstd
 
 # Directory containing zip files
 ntsb_data_dir = Path("c:\\Users\\asus\\Desktop\\FlightCrashes\\NTSB_scraping\\ntsb_data")
 output_dir = ntsb_data_dir / "extracted"
 
-# Create output directory if it doesn't exist
-output_dir.mkdir(exist_ok=True)
 
-# Get all zip files
-zip_files = sorted(ntsb_data_dir.glob("ntsb_*.zip"))
-
-print(f"Found {len(zip_files)} zip files to extract")
-
-for zip_path in zip_files:
+def extract_one(zip_path: Path, output_dir: Path) -> str:
+    """Extract one monthly zip into output_dir, prefixing each file with its year and month"""
     # Extract year and month from filename (e.g., ntsb_2010_01.zip)
     stem = zip_path.stem  # ntsb_2010_01
     parts = stem.split("_")
     year = parts[1]
     month = parts[2]
-    
-    print(f"Extracting {zip_path.name}...", end=" ")
-    
+
+    # JSON members are stored zstd-compressed; merge_extracted_json.py reads them back
+    cctx = zstd.ZstdCompressor(level=3)
+
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
             # Get all files in the zip
-            file_list = zip_ref.namelist()
-            
-            for file_info in zip_ref.infolist():
-                # Extract the file
-                file_content = zip_ref.read(file_info.filename)
-                
+            infos = zip_ref.infolist()
+
+            for file_info in infos:
+                if file_info.is_dir():
+                    continue
+
                 # Create a new filename with year_month prefix
-                original_name = Path(file_info.filename).name
-                if original_name:  # Skip directories
-                    new_name = f"{year}_{month}_{original_name}"
-                    output_path = output_dir / new_name
-                    
-                    # Write the file
-                    with open(output_path, 'wb') as f:
-                        f.write(file_content)
-        
-        print(f"✓ ({len(file_list)} files)")
+                new_name = f"{year}_{month}_{Path(file_info.filename).name}"
+                output_path = output_dir / new_name
+
+                # Stream the member to disk instead of reading it into memory
+                if output_path.suffix == '.json':
+                    output_path = output_path.with_name(f"{new_name}.zst")
+                    with zip_ref.open(file_info) as src, open(output_path, 'wb') as raw, \
+                            cctx.stream_writer(raw) as dst:
+                        shutil.copyfileobj(src, dst, length=128 * 1024)
+                else:
+                    with zip_ref.open(file_info) as src, open(output_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, length=128 * 1024)
+
+        return f"Extracting {zip_path.name}... ✓ ({len(infos)} files)"
     except Exception as e:
-        print(f"✗ Error: {e}")
+        return f"Extracting {zip_path.name}... ✗ Error: {e}"
+
+
+if __name__ == "__main__":
+    # Create output directory if it doesn't exist
+    output_dir.mkdir(exist_ok=True)
+
+    # Get all zip files
+    zip_files = sorted(ntsb_data_dir.glob("ntsb_*.zip"))
+
+    print(f"Found {len(zip_files)} zip files to extract")
+
+    # Inflating is CPU-bound, so spread the archives across processes
+    with ProcessPoolExecutor() as executor:
+        for message in executor.map(partial(extract_one, output_dir=output_dir), zip_files):
+            print(message)
 
-# Count extracted files
-extracted_files = list(output_dir.glob("*"))
-print(f"\nTotal files extracted: {len(extracted_files)}")
-print(f"Extracted to: {output_dir}")
+    # Count extracted files
+    extracted_files = list(output_dir.glob("*"))
+    print(f"\nTotal files extracted: {len(extracted_files)}")
+    print(f"Extracted to: {output_dir}")
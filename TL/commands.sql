@@ -122,9 +122,11 @@ CREATE UNIQUE INDEX idx_dim_operator_unique_id ON dim_operator(data_source, sour
 -- ============================================================
 -- PHASE 2: STAGING TABLES (For raw data ingestion)
 -- ============================================================
+-- UNLOGGED: staging rows are reloadable from the source files, so skip WAL.
+-- Existing databases: ALTER TABLE stg_source1_aviation_safety SET UNLOGGED; (same for stg_source2_ntsb, stg_source3_csv)
 
 -- Staging for Source 1 (Aviation Safety JSON)
-CREATE TABLE stg_source1_aviation_safety (
+CREATE UNLOGGED TABLE stg_source1_aviation_safety (
     stg_id SERIAL PRIMARY KEY,
     source_unique_id VARCHAR(100),
     raw_json JSONB,
@@ -137,7 +139,7 @@ ALTER TABLE stg_source1_aviation_safety
 ADD CONSTRAINT stg_source1_unique UNIQUE (source_unique_id);
 
 -- Staging for Source 2 (NTSB JSON)
-CREATE TABLE stg_source2_ntsb (
+CREATE UNLOGGED TABLE stg_source2_ntsb (
     stg_id SERIAL PRIMARY KEY,
     source_unique_id VARCHAR(100),
     raw_json JSONB,
@@ -151,7 +153,7 @@ ADD CONSTRAINT stg_source2_unique UNIQUE (source_unique_id);
 
 
 -- Staging for Source 3 (CSV)
-CREATE TABLE stg_source3_csv (
+CREATE UNLOGGED TABLE stg_source3_csv (
     stg_id SERIAL PRIMARY KEY,
     source_unique_id VARCHAR(100),
     raw_data JSONB,
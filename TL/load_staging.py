@@ -1,8 +1,11 @@
-import json
 import csv
+import io
 import os
+from itertools import islice
+import ijson
+import orjson
 import psycopg2
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_values
 
 DB = {
     "dbname": "FlightAccidentMain",
@@ -12,33 +15,67 @@ DB = {
     "port": 5432
 }
 
+# Rows sent (and committed) per batch; keeps memory flat on large sources
+CHUNK_SIZE = 5000
+
 conn = psycopg2.connect(**DB)
 cur = conn.cursor()
 
+
+def chunked(iterable, n):
+    """Yield successive lists of up to n items from iterable"""
+    it = iter(iterable)
+    while (batch := list(islice(it, n))):
+        yield batch
+
+
+def staging_chunks(rows):
+    """Yield CHUNK_SIZE batches of rows, each opening a transaction with synchronous_commit off"""
+    for chunk in chunked(rows, CHUNK_SIZE):
+        # Staging data is reloadable from the source files, so don't wait on fsync at each commit
+        cur.execute("SET LOCAL synchronous_commit = off;")
+        yield chunk
+
+
+# Characters COPY's text format treats specially inside a field
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_text_field(value):
+    """Encode a value as a COPY text-format field; None becomes NULL, '' stays an empty string"""
+    if value is None:
+        return "\\N"
+    return str(value).translate(_COPY_ESCAPES)
+
+
 # =====================================================
 # JSON SOURCE 1 - Aviation Safety Network
 # =====================================================
 def load_source1_aviation(path):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(path, "rb") as f:
+        accidents = ijson.items(f, "accidents.item", use_float=True)  # <-- focus on the array of records
 
-    accidents = data["accidents"]  # <-- focus on the array of records
-    rows = []
+        def row_iter():
+            for record in accidents:
+                source_id = record.get("url").split("/")[-1]  # wikibase ID
+                yield (source_id, orjson.dumps(record).decode())
 
-    for record in accidents:
-        source_id = record.get("url").split("/")[-1]  # wikibase ID
-        rows.append((source_id, json.dumps(record)))
+        row_count = 0
+        for chunk in staging_chunks(row_iter()):
+            execute_values(cur,
+                """
+                INSERT INTO stg_source1_aviation_safety (source_unique_id, raw_json)
+                VALUES %s
+                ON CONFLICT (source_unique_id) DO NOTHING;
+                """,
+                chunk,
+                template="(%s, %s::jsonb)",
+                page_size=CHUNK_SIZE
+            )
+            conn.commit()
+            row_count += len(chunk)
 
-    execute_batch(cur,
-        """
-        INSERT INTO stg_source1_aviation_safety (source_unique_id, raw_json)
-        VALUES (%s, %s::jsonb)
-        ON CONFLICT (source_unique_id) DO NOTHING;
-        """,
-        rows
-    )
-
-    print(f"Loaded {len(rows)} rows → stg_source1_aviation_safety")
+    print(f"Loaded {row_count} rows → stg_source1_aviation_safety")
 
 
 
@@ -46,27 +83,50 @@ def load_source1_aviation(path):
 # JSON SOURCE 2 - NTSB
 # =====================================================
 def load_source2_ntsb(path):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    rows = []
-    for record in data:
-        # Unique ID = cm_ntsbNum (e.g., 'WPR26LA036')
-        source_id = record.get("cm_ntsbNum")
-        raw_json = json.dumps(record)
-
-        rows.append((source_id, raw_json))
-
-    execute_batch(cur,
+    # Biggest source: COPY each chunk into a temp table, then upsert it in a single statement.
+    # ON COMMIT DELETE ROWS empties the temp table as each chunk is committed.
+    cur.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS tmp_stg_source2_ntsb (
+            source_unique_id VARCHAR(100),
+            raw_json TEXT
+        ) ON COMMIT DELETE ROWS;
         """
-        INSERT INTO stg_source2_ntsb (source_unique_id, raw_json)
-        VALUES (%s, %s::jsonb)
-        ON CONFLICT (source_unique_id) DO NOTHING;
-        """,
-        rows
     )
 
-    print(f"Loaded {len(rows)} rows → stg_source2_ntsb")
+    with open(path, "rb") as f:
+        records = ijson.items(f, "item", use_float=True)
+
+        def row_iter():
+            for record in records:
+                # Unique ID = cm_ntsbNum (e.g., 'WPR26LA036')
+                source_id = record.get("cm_ntsbNum")
+                raw_json = orjson.dumps(record).decode()
+
+                yield (source_id, raw_json)
+
+        row_count = 0
+        for chunk in staging_chunks(row_iter()):
+            # Text format rather than csv: csv can't tell an empty cm_ntsbNum from a missing one,
+            # and an empty ID loaded as NULL would slip past the ON CONFLICT dedupe
+            buf = io.StringIO()
+            buf.writelines(
+                f"{copy_text_field(source_id)}\t{copy_text_field(raw_json)}\n" for source_id, raw_json in chunk
+            )
+            buf.seek(0)
+
+            cur.copy_expert("COPY tmp_stg_source2_ntsb (source_unique_id, raw_json) FROM STDIN", buf)
+            cur.execute(
+                """
+                INSERT INTO stg_source2_ntsb (source_unique_id, raw_json)
+                SELECT source_unique_id, raw_json::jsonb FROM tmp_stg_source2_ntsb
+                ON CONFLICT (source_unique_id) DO NOTHING;
+                """
+            )
+            conn.commit()
+            row_count += len(chunk)
+
+    print(f"Loaded {row_count} rows → stg_source2_ntsb")
 
 
 # =====================================================
@@ -76,23 +136,31 @@ def load_source3_csv(path):
     with open(path, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
 
-        rows = []
-        for row in reader:
-            source_id = row.get("index")      # Your sample uses index as the unique ID
-            raw_data = json.dumps(row)
-
-            rows.append((source_id, raw_data))
-
-        execute_batch(cur,
-            """
-            INSERT INTO stg_source3_csv (source_unique_id, raw_data)
-            VALUES (%s, %s::jsonb)
-            ON CONFLICT (source_unique_id) DO NOTHING;
-            """,
-            rows
-        )
-
-    print(f"Loaded {len(rows)} rows → stg_source3_csv")
+        # Rows are encoded lazily, one chunk at a time
+        def row_iter():
+            for row in reader:
+                source_id = row.get("index")      # Your sample uses index as the unique ID
+                # DictReader files surplus values under a None key, hence OPT_NON_STR_KEYS
+                raw_data = orjson.dumps(row, option=orjson.OPT_NON_STR_KEYS).decode()
+
+                yield (source_id, raw_data)
+
+        row_count = 0
+        for chunk in staging_chunks(row_iter()):
+            execute_values(cur,
+                """
+                INSERT INTO stg_source3_csv (source_unique_id, raw_data)
+                VALUES %s
+                ON CONFLICT (source_unique_id) DO NOTHING;
+                """,
+                chunk,
+                template="(%s, %s::jsonb)",
+                page_size=CHUNK_SIZE
+            )
+            conn.commit()
+            row_count += len(chunk)
+
+    print(f"Loaded {row_count} rows → stg_source3_csv")
 
 
 # =====================================================